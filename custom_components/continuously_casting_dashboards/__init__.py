@@ -1,12 +1,10 @@
 """The Continuously Cast Dashboards integration."""
-from .const import DOMAIN, PLATFORMS
-from .dashboard_caster import ContinuouslyCastingDashboards
-import voluptuous as vol
-import homeassistant.helpers.config_validation as cv
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 from homeassistant.core import HomeAssistant
 
-from homeassistant.const import CONF_DEVICES, CONF_SCAN_INTERVAL
+from .const import DOMAIN
+from .dashboard_caster import ContinuouslyCastingDashboards
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Continuously Cast Dashboards integration."""
@@ -14,9 +12,13 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     if conf is None:
         return True
 
-    hass.data.setdefault(DOMAIN, {})
+    domain_data = hass.data.setdefault(DOMAIN, {})
 
     # Start the ContinuouslyCastingDashboards
     caster = ContinuouslyCastingDashboards(hass, conf)
-    hass.loop.create_task(caster.start())
-    return True
\ No newline at end of file
+    domain_data["caster"] = caster
+    hass.async_create_background_task(caster.start(), name=f"{DOMAIN}_start")
+
+    # Cancel the casting loop when Home Assistant shuts down
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, caster.stop)
+    return True
@@ -1,3 +1,8 @@
 """Constants for the Continuously Cast Dashboards integration."""
 DOMAIN = "continuously_casting_dashboards"
 PLATFORMS = []
+
+MAX_RETRIES = 5
+MAX_CONCURRENT_CATT_PROCESSES = 4
+VOLUME_CACHE_TTL = 30
+DEVICE_COOLDOWN_MAX_CYCLES = 4  # longest failing device cooldown, in casting loop passes
@@ -1,11 +1,33 @@
 import asyncio
+import random
+import re
 import subprocess
 import logging
 import logging.handlers
 
+from datetime import datetime
+from functools import partial
+
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
+
+from .const import (
+    DEVICE_COOLDOWN_MAX_CYCLES,
+    MAX_CONCURRENT_CATT_PROCESSES,
+    MAX_RETRIES,
+    VOLUME_CACHE_TTL,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
-from datetime import datetime
+_VOLUME_RE = re.compile(r"^Volume:\s*(\d+)", re.MULTILINE)
+
+_LOG_LEVELS = {
+    name.lower(): getattr(logging, name)
+    for name in ("CRITICAL", "FATAL", "ERROR", "WARNING", "WARN", "INFO", "DEBUG", "NOTSET")
+}
 
 
 # Define the ContinuouslyCastingDashboards class
@@ -16,8 +38,9 @@ class ContinuouslyCastingDashboards:
         self.device_map = {}  # the current device time plan
         self.all_device_map = {}  # all device time plans
         self.cast_delay = self.config["cast_delay"]
-        self.max_retries = 5
-        self.retry_delay = 30
+        self.max_retries = MAX_RETRIES
+        # Spread the status retries over at most one cast delay
+        self.retry_delay = self.cast_delay / MAX_RETRIES
         self.switch_entity_id = config.get("switch_entity_id", None)
         self.was_casting_enabled = True  # Initialize the flag to True
         self.device_was_casting_enabled = {}  # Initialize the dictionary to track each device
@@ -37,6 +60,7 @@ class ContinuouslyCastingDashboards:
                     device_info.get("end_time", global_end_time), "%H:%M"
                 ).time()
                 # uses -1 as a default volume if not configured by user.
+                volume = device_info.get("volume", -1)
                 speaker_groups = device_info.get("speaker_groups")
                 if speaker_groups is not None and not isinstance(speaker_groups, list):
                     speaker_groups = [speaker_groups]
@@ -50,10 +74,13 @@ class ContinuouslyCastingDashboards:
                         "media_state_name": device_info.get(
                             "media_state_name", "PLAYING"
                         ),
-                        "volume": device_info.get("volume", -1),
+                        "volume": volume,
+                        # catt volume argument to restore after casting, None keeps the device volume
+                        "cast_volume": str(volume * 10) if volume != -1 else None,
                         "start_time": start_time,
                         "end_time": end_time,
                         "instance_change": False,
+                        "in_range": False,
                         "speaker_groups": speaker_groups,
                     }
                 )
@@ -84,167 +111,190 @@ class ContinuouslyCastingDashboards:
                 for trigger in state_triggers_config
             ]
 
-        # Create a set of monitored entities
-        self.monitored_entities = set()
-        for state_triggers in self.state_triggers_map.values():
+        # One lock per device so only one cast sequence runs against a device at a time
+        self._cast_locks = {
+            device_name: asyncio.Lock()
+            for device_name in {*self.all_device_map, *self.state_triggers_map}
+        }
+
+        self._failure_counts = {}  # consecutive failed cycles per device
+        self._skip_cycles = {}  # main loop passes a failing device is still skipped for
+        self._volume_cache = {}  # device name -> (volume, loop time it was read)
+
+        # Limit concurrent catt processes so many devices casting at once cannot fork-storm the host
+        self._catt_semaphore = asyncio.Semaphore(MAX_CONCURRENT_CATT_PROCESSES)
+
+        # Index triggers by entity so a state change only looks at the triggers for that entity
+        self.triggers_by_entity = {}
+        for device_name, state_triggers in self.state_triggers_map.items():
             for trigger in state_triggers:
-                self.monitored_entities.add(trigger["entity_id"])
+                self.triggers_by_entity.setdefault(trigger["entity_id"], []).append(
+                    (device_name, trigger)
+                )
+
+        # Create a set of monitored entities
+        self.monitored_entities = set(self.triggers_by_entity)
+        self._state_change_unsub = None
+        self._main_task = None
+        self._stop_timeout_unsubs = {}  # pending triggered casting timeouts per device
 
         # Set up logging
         log_level = config.get("logging_level", "info")
-        numeric_log_level = getattr(logging, log_level.upper(), None)
-        if not isinstance(numeric_log_level, int):
+        numeric_log_level = _LOG_LEVELS.get(log_level.lower())
+        if numeric_log_level is None:
             raise ValueError(f"Invalid log level: {log_level}")
         _LOGGER.setLevel(numeric_log_level)
 
-        _LOGGER.debug(f"state_triggers_map: {self.state_triggers_map}")
-        _LOGGER.debug(f"monitored_entities: {self.monitored_entities}")
+        _LOGGER.debug("state_triggers_map: %s", self.state_triggers_map)
+        _LOGGER.debug("monitored_entities: %s", self.monitored_entities)
 
     # Function to handle state change events
     async def handle_state_change_event(self, event):
         entity_id = event.data["entity_id"]
-
-        # Skip state changes for entities not in the monitored_entities set
-        if entity_id not in self.monitored_entities:
-            return
-
         new_state = event.data.get("new_state")
         if new_state is None:
             return
 
-        _LOGGER.debug(f"Entity '{entity_id}' state changed to: {new_state.state}")
+        _LOGGER.debug("Entity '%s' state changed to: %s", entity_id, new_state.state)
 
-        # Check if the state change matches a trigger and cast the dashboard if so
-        for device_name, state_triggers in self.state_triggers_map.items():
-            for trigger in state_triggers:
-                if (
-                    trigger["entity_id"] == entity_id
-                    and trigger["to_state"] == new_state.state
-                ):
-                    force_cast = trigger.get("force_cast", False)
-                    media_playing = await self.check_media_state(device_name)
-
-                    # Only cast the dashboard if force_cast is True or media is not playing
-                    if force_cast or not media_playing:
-                        _LOGGER.debug(
-                            f"Matched state for entity '{entity_id}', casting dashboard to {device_name}"
-                        )
-                        self.casting_triggered_by_state_change = True
-                        await self.cast_dashboard(device_name, trigger["dashboard_url"])
-                        if "time_out" in trigger:
-                            self.hass.loop.create_task(
-                                self.stop_casting_after_timeout(
-                                    device_name, trigger["time_out"]
-                                )
-                            )
-                        self.casting_triggered_by_state_change = False
-                        break
-                    else:
-                        _LOGGER.debug(
-                            f"Media is playing on {device_name}, not casting dashboard due to force_cast being set to False"
-                        )
+        # Check if the state change matches a trigger and cast the dashboard if so, once per device
+        cast_devices = set()
+        for device_name, trigger in self.triggers_by_entity.get(entity_id, ()):
+            if device_name in cast_devices or trigger["to_state"] != new_state.state:
+                continue
+            force_cast = trigger.get("force_cast", False)
+            media_playing = await self.check_media_state(device_name)
 
-    # Function to stop casting after a configured timeout for the triggered casting functionality
-    async def stop_casting_after_timeout(self, device_name, timeout):
-        if timeout:
-            await asyncio.sleep(timeout)
-            _LOGGER.info(
-                f"Stopping casting dashboard on {device_name} after {timeout} seconds timeout"
+            # Only cast the dashboard if force_cast is True or media is not playing
+            if force_cast or not media_playing:
+                _LOGGER.debug(
+                    "Matched state for entity '%s', casting dashboard to %s",
+                    entity_id,
+                    device_name,
+                )
+                self.casting_triggered_by_state_change = True
+                await self.cast_dashboard(device_name, trigger["dashboard_url"])
+                if trigger["time_out"]:
+                    self.schedule_stop_casting(device_name, trigger["time_out"])
+                self.casting_triggered_by_state_change = False
+                cast_devices.add(device_name)
+            else:
+                _LOGGER.debug(
+                    "Media is playing on %s, not casting dashboard due to force_cast being set to False",
+                    device_name,
+                )
+
+    # Function to schedule stopping the cast after a configured timeout for the triggered casting functionality
+    def schedule_stop_casting(self, device_name, timeout):
+        # A new trigger replaces any pending timeout for the same device
+        cancel = self._stop_timeout_unsubs.pop(device_name, None)
+        if cancel is not None:
+            cancel()
+        self._stop_timeout_unsubs[device_name] = async_call_later(
+            self.hass, timeout, partial(self.stop_casting_after_timeout, device_name, timeout)
+        )
+
+    # Function to stop casting once the triggered casting timeout has expired
+    async def stop_casting_after_timeout(self, device_name, timeout, now=None):
+        self._stop_timeout_unsubs.pop(device_name, None)
+        _LOGGER.info(
+            "Stopping casting dashboard on %s after %s seconds timeout",
+            device_name,
+            timeout,
+        )
+        await self.stop_casting_on_device(device_name)
+
+    # Function to run a catt command against a device, capping how many catt processes run at once
+    async def run_catt(self, device_name, *args, timeout=None, capture_output=False):
+        # Commands run for their effect only need stderr, and only to log it when they fail
+        stdout = subprocess.PIPE if capture_output else subprocess.DEVNULL
+        async with self._catt_semaphore:
+            process = await asyncio.create_subprocess_exec(
+                "catt", "-d", device_name, *args, stdout=stdout, stderr=subprocess.PIPE
             )
             try:
-                process = await asyncio.create_subprocess_exec(
-                    "catt", "-d", device_name, "stop"
-                )
-                await process.wait()
-            except subprocess.CalledProcessError as e:
-                _LOGGER.error(f"Error stopping dashboard on {device_name}: {e}")
-                return None
-            except ValueError as e:
-                _LOGGER.error(f"Invalid file descriptor for {device_name}: {e}")
-                return None
-            except asyncio.TimeoutError as e:
-                _LOGGER.error(f"Timeout stopping dashboard on {device_name}: {e}")
-                return None
+                output = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                # Do not leave catt running when a command times out or the caster is stopped mid-command
+                self.kill_process(process)
+                raise
+        if not capture_output and process.returncode and output[1]:
+            _LOGGER.debug(
+                "catt %s on %s failed: %s", args[0], device_name, output[1].decode().strip()
+            )
+        return output
+
+    # Function to kill a catt process that may already have exited
+    @staticmethod
+    def kill_process(process):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
 
     # Function to check the status of the device
     async def check_status(self, device_name, state):
         try:
-            process = await asyncio.create_subprocess_exec(
-                "catt",
-                "-d",
-                device_name,
-                "status",
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+            stdout, stderr = await self.run_catt(
+                device_name, "status", timeout=30, capture_output=True
             )
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=30)
+            if not stdout and stderr:
+                # catt could not reach the device, for example a switched off device catt cannot find.
+                # Report it as a failed status so the caller retries instead of treating it as idle
+                _LOGGER.debug(
+                    "Unable to get the status of %s: %s", device_name, stderr.decode().strip()
+                )
+                return None
             status_output = stdout.decode()
             return status_output
         except subprocess.CalledProcessError as e:
             _LOGGER.error(
-                f"Error checking {state} state for {device_name}: {e}\nOutput: {e.output.decode()}"
+                "Error checking %s state for %s: %s\nOutput: %s",
+                state,
+                device_name,
+                e,
+                e.output.decode(),
             )
             return None
         except subprocess.TimeoutExpired as e:
-            _LOGGER.error(f"Timeout checking {state} state for {device_name}: {e}")
+            _LOGGER.error("Timeout checking %s state for %s: %s", state, device_name, e)
             return None
         except ValueError as e:
-            _LOGGER.error(f"Invalid file descriptor for {device_name}: {e}")
+            _LOGGER.error("Invalid file descriptor for %s: %s", device_name, e)
             return None
         except (
             asyncio.exceptions.TimeoutError
         ) as e:  # Add proper exception handling for TimeoutError
             _LOGGER.error(
-                f"Asyncio TimeoutError checking {state} state for {device_name}: {e}"
+                "Asyncio TimeoutError checking %s state for %s: %s",
+                state,
+                device_name,
+                e,
             )
             return None
 
     # Function to check if the dashboard state is active
     async def check_dashboard_state(self, device_name):
-        try:
-            dashboard_state_name = self.device_map[device_name]["dashboard_state_name"]
-            status_output = await self.check_status(device_name, dashboard_state_name)
-            if status_output is not None and dashboard_state_name in status_output:
-                _LOGGER.debug(
-                    f"Status output for {device_name} when checking for dashboard state '{dashboard_state_name}': {status_output}"
-                )
-                _LOGGER.debug("Dashboard active")
-                return True
-        except subprocess.CalledProcessError as e:
-            _LOGGER.error(
-                f"Error checking state for {device_name}: {e}\nOutput: {e.output.decode()}"
-            )
-            return None
-        except subprocess.TimeoutExpired as e:
-            _LOGGER.error(f"Timeout checking state for {device_name}: {e}")
-            return None
-        except ValueError as e:
-            _LOGGER.error(f"Invalid file descriptor for {device_name}: {e}")
-            return None
-        return None
+        return await self.check_named_state(device_name, "dashboard_state_name", "Dashboard active")
 
     # Function to check if media is playing on the device
     async def check_media_state(self, device_name):
-        try:
-            media_state_name = self.device_map[device_name]["media_state_name"]
-            status_output = await self.check_status(device_name, media_state_name)
-            if status_output is not None and media_state_name in status_output:
-                _LOGGER.debug(
-                    f"Status output for {device_name} when checking for dashboard state '{media_state_name}': {status_output}"
-                )
-                _LOGGER.debug("Media is playing!")
-                return True
-        except subprocess.CalledProcessError as e:
-            _LOGGER.error(
-                f"Error checking state for {device_name}: {e}\nOutput: {e.output.decode()}"
+        return await self.check_named_state(device_name, "media_state_name", "Media is playing!")
+
+    # Function to check if the device status contains the configured state name
+    async def check_named_state(self, device_name, state_key, active_message):
+        state_name = self.device_map[device_name][state_key]
+        # check_status already logs and swallows catt failures, returning None
+        status_output = await self.check_status(device_name, state_name)
+        if status_output is not None and state_name in status_output:
+            _LOGGER.debug(
+                "Status output for %s when checking for state '%s': %s",
+                device_name,
+                state_name,
+                status_output,
             )
-            return None
-        except subprocess.TimeoutExpired as e:
-            _LOGGER.error(f"Timeout checking state for {device_name}: {e}")
-            return None
-        except ValueError as e:
-            _LOGGER.error(f"Invalid file descriptor for {device_name}: {e}")
-            return None
+            _LOGGER.debug(active_message)
+            return True
         return None
 
     # Function to check if either dashboard or media state is active
@@ -252,10 +302,16 @@ class ContinuouslyCastingDashboards:
         dashboard_state_name = self.device_map[device_name]["dashboard_state_name"]
         status_output = await self.check_status(device_name, dashboard_state_name)
 
-        if status_output is None or not status_output:
+        # None means catt status itself failed, which the main loop retries
+        if status_output is None:
+            return None
+        if not status_output:
             return False
         _LOGGER.debug(
-            f"Status output for {device_name} when checking for dashboard state '{dashboard_state_name}': {status_output}"
+            "Status output for %s when checking for dashboard state '%s': %s",
+            device_name,
+            dashboard_state_name,
+            status_output,
         )
 
         is_dashboard_state = dashboard_state_name in status_output
@@ -266,130 +322,169 @@ class ContinuouslyCastingDashboards:
     # Function to check if speaker group is active
     async def check_speaker_group_state(self, device_name):
         speaker_groups = self.device_map[device_name]["speaker_groups"]
-        for speaker_group in speaker_groups:
-            _LOGGER.debug(f"Checking Speaker Group: {speaker_group} (type: {type(speaker_group)})")
-            try:
-                process = await asyncio.create_subprocess_exec(
-                    "catt",
-                    "-d",
-                    speaker_group,
-                    "status",
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                )
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=30)
-                status_output = stdout.decode()
-                _LOGGER.debug(f"Status output for Speaker Group: {speaker_group}: {status_output}")
-                if "PLAYING" in status_output:
-                    _LOGGER.debug(f"Speaker Group playback is active on {device_name} for Speaker Group: {speaker_group}")
-                    return True
-                else:
-                    _LOGGER.debug(f"Speaker Group playback is NOT active on {device_name} for Speaker Group: {speaker_group}")
-            except subprocess.CalledProcessError as e:
-                _LOGGER.error(
-                    f"Error checking PLAYING state for {speaker_group}: {e}\nOutput: {e.output.decode()}"
+        # Query every speaker group at once so one slow group does not delay the others
+        results = await asyncio.gather(
+            *(
+                self.check_single_speaker_group_state(device_name, speaker_group)
+                for speaker_group in speaker_groups
+            )
+        )
+        if True in results:
+            return True
+        if None in results:
+            return None
+        return False
+
+    # Function to check if a single speaker group is playing
+    async def check_single_speaker_group_state(self, device_name, speaker_group):
+        _LOGGER.debug("Checking Speaker Group: %s (type: %s)", speaker_group, type(speaker_group))
+        try:
+            stdout, stderr = await self.run_catt(
+                speaker_group, "status", timeout=30, capture_output=True
+            )
+            # Only the PLAYING marker matters here, so test the raw bytes and decode just for debug output
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(
+                    "Status output for Speaker Group: %s: %s", speaker_group, stdout.decode()
                 )
-                return None
-            except subprocess.TimeoutExpired as e:
-                _LOGGER.error(f"Timeout checking PLAYING state for {device_name} for Speaker Group: {speaker_group}: {e}")
-                return None
-            except ValueError as e:
-                _LOGGER.error(f"Invalid file descriptor for {device_name} for Speaker Group: {speaker_group}: {e}")
-                return None
-            except (
-                asyncio.exceptions.TimeoutError
-            ) as e:  # Add proper exception handling for TimeoutError
-                _LOGGER.error(
-                    f"Asyncio TimeoutError checking PLAYING state for {device_name} for Speaker Group: {speaker_group}: {e}"
+            if b"PLAYING" in stdout:
+                _LOGGER.debug(
+                    "Speaker Group playback is active on %s for Speaker Group: %s", device_name, speaker_group
                 )
-                return None
-        return False
+                return True
+            _LOGGER.debug(
+                "Speaker Group playback is NOT active on %s for Speaker Group: %s", device_name, speaker_group
+            )
+            return False
+        except subprocess.CalledProcessError as e:
+            _LOGGER.error(
+                "Error checking PLAYING state for %s: %s\nOutput: %s",
+                speaker_group,
+                e,
+                e.output.decode(),
+            )
+            return None
+        except subprocess.TimeoutExpired as e:
+            _LOGGER.error("Timeout checking PLAYING state for %s for Speaker Group: %s: %s", device_name, speaker_group, e)
+            return None
+        except ValueError as e:
+            _LOGGER.error("Invalid file descriptor for %s for Speaker Group: %s: %s", device_name, speaker_group, e)
+            return None
+        except (
+            asyncio.exceptions.TimeoutError
+        ) as e:  # Add proper exception handling for TimeoutError
+            _LOGGER.error(
+                "Asyncio TimeoutError checking PLAYING state for %s for Speaker Group: %s: %s",
+                device_name,
+                speaker_group,
+                e,
+            )
+            return None
 
     async def is_media_playing(self, device_name):
         try:
-            _LOGGER.debug(f"Checking media status for {device_name}")
+            _LOGGER.debug("Checking media status for %s", device_name)
             media_state_name = self.device_map[device_name]["media_state_name"]
             status_output = await self.check_status(device_name, media_state_name)
 
             if status_output:
                 if "PLAYING" in status_output or "PAUSED" in status_output:
-                    _LOGGER.debug(f"Media is currently playing or paused on {device_name}")
+                    _LOGGER.debug("Media is currently playing or paused on %s", device_name)
                     return True
 
-                _LOGGER.debug(f"Media is not playing, waiting 5 seconds before re-checking...")
+                _LOGGER.debug("Media is not playing, waiting 5 seconds before re-checking...")
                 await asyncio.sleep(5)
 
                 # Re-check the media status
                 status_output = await self.check_status(device_name, media_state_name)
                 if status_output and ("PLAYING" in status_output or "PAUSED" in status_output):
-                    _LOGGER.debug(f"Media is now playing or paused on {device_name} after delay")
+                    _LOGGER.debug("Media is now playing or paused on %s after delay", device_name)
                     return True
 
-            _LOGGER.debug(f"Media is not playing on {device_name}")
+            _LOGGER.debug("Media is not playing on %s", device_name)
             return False
         except Exception as e:
-            _LOGGER.error(f"Error checking media status for {device_name}: {e}")
+            _LOGGER.error("Error checking media status for %s: %s", device_name, e)
             return False
 
+    # Function to get the current volume of the device, if fails, default to 5
+    async def get_current_volume(self, device_name, media_state_name):
+        # Reuse the volume a recent cast restored, the volume rarely changes between casts a few seconds apart
+        cached = self._volume_cache.get(device_name)
+        if cached is not None and self.hass.loop.time() - cached[1] < VOLUME_CACHE_TTL:
+            return cached[0]
+
+        status_output = await self.check_status(device_name, media_state_name)
+        match = _VOLUME_RE.search(status_output) if status_output else None
+        if match is None:
+            _LOGGER.warning(
+                "Failed to extract volume information from status_output for %s. Using default volume 5.",
+                device_name,
+            )
+            return 5
+        current_volume = match.group(1)
+        self._volume_cache[device_name] = (current_volume, self.hass.loop.time())
+        return current_volume
+
     # Function to cast the dashboard to the device
     async def cast_dashboard(self, device_name, dashboard_url):
+        # A state trigger and the main loop can cast to the same device at once, serialise them
+        async with self._cast_locks[device_name]:
+            return await self._cast_dashboard(device_name, dashboard_url)
+
+    async def _cast_dashboard(self, device_name, dashboard_url):
         if await self.is_media_playing(device_name):
-            _LOGGER.info(f"Skipping cast to {device_name} because media is playing or paused.")
+            _LOGGER.info("Skipping cast to %s because media is playing or paused.", device_name)
             return
+        device_info = self.device_map[device_name]
         try:
-            _LOGGER.info(f"Casting dashboard to {device_name}")
+            _LOGGER.info("Casting dashboard to %s", device_name)
 
-            process = await asyncio.create_subprocess_exec(
-                "catt", "-d", device_name, "stop"
-            )
             _LOGGER.debug("Executing stop command...")
-            await asyncio.wait_for(process.wait(), timeout=10)
-            # test test test
-            # check the current volume of the device, if fails, default to 5
-            media_state_name = self.device_map[device_name]["media_state_name"]
-            status_output = await self.check_status(device_name, media_state_name)
-            try:
-                current_volume = status_output.rsplit(":", 1)[1].strip()
-                current_volume = current_volume if current_volume.isdigit() else 5
-            except IndexError:
-                _LOGGER.warning(
-                    f"Failed to extract volume information from status_output for {device_name}. Using default volume 5."
-                )
-                current_volume = 5
-
-            process = await asyncio.create_subprocess_exec(
-                "catt", "-d", device_name, "volume", "0"
+            # check the current volume of the device while the stop runs
+            stop_task = asyncio.create_task(self.run_catt(device_name, "stop", timeout=10))
+            volume_task = asyncio.create_task(
+                self.get_current_volume(device_name, device_info["media_state_name"])
             )
-            _LOGGER.debug("Setting volume to 0...")
-            await asyncio.wait_for(process.wait(), timeout=10)
+            try:
+                await asyncio.gather(stop_task, volume_task)
+            except BaseException:
+                # gather does not cancel the other call when one fails, do not leave it running once the lock is released
+                stop_task.cancel()
+                volume_task.cancel()
+                await asyncio.gather(stop_task, volume_task, return_exceptions=True)
+                raise
+            current_volume = volume_task.result()
+
+            # The device is muted for the cast either way, skip the command if it already is
+            if str(current_volume) != "0":
+                _LOGGER.debug("Setting volume to 0...")
+                await self.run_catt(device_name, "volume", "0", timeout=10)
 
-            process = await asyncio.create_subprocess_exec(
-                "catt", "-d", device_name, "cast_site", dashboard_url
-            )
             _LOGGER.info("Executing the dashboard cast command...")
-            await asyncio.wait_for(process.wait(), timeout=10)
+            await self.run_catt(device_name, "cast_site", dashboard_url, timeout=10)
 
             # if the config didn't set a volume use the current device volume
-            if self.device_map[device_name].get("volume", 5) != -1:
-                custom_volume = self.device_map[device_name].get("volume", 5) * 10
-            else:
-                custom_volume = current_volume
-
-            custom_volume_str = str(custom_volume)
+            custom_volume_str = device_info["cast_volume"] or str(current_volume)
 
-            process = await asyncio.create_subprocess_exec(
-                "catt", "-d", device_name, "volume", custom_volume_str
-            )
-            _LOGGER.info(f"Setting volume to {custom_volume_str}...")
-            await asyncio.wait_for(process.wait(), timeout=10)
+            if custom_volume_str != "0":
+                _LOGGER.info("Setting volume to %s...", custom_volume_str)
+                await self.run_catt(device_name, "volume", custom_volume_str, timeout=10)
+            else:
+                _LOGGER.debug("Volume is already 0, skipping volume command")
+            # The device is now at the volume just restored, so the next cast can start from it.
+            # Keep the time of the catt status read so reusing the cache does not keep extending the TTL
+            cached = self._volume_cache.get(device_name)
+            if cached is not None:
+                self._volume_cache[device_name] = (custom_volume_str, cached[1])
         except subprocess.CalledProcessError as e:
-            _LOGGER.error(f"Error casting dashboard to {device_name}: {e}")
+            _LOGGER.error("Error casting dashboard to %s: %s", device_name, e)
             return None
         except ValueError as e:
-            _LOGGER.error(f"Invalid file descriptor for {device_name}: {e}")
+            _LOGGER.error("Invalid file descriptor for %s: %s", device_name, e)
             return None
         except asyncio.TimeoutError as e:
-            _LOGGER.error(f"Timeout casting dashboard to {device_name}: {e}")
+            _LOGGER.error("Timeout casting dashboard to %s: %s", device_name, e)
             return None
 
     # Function to decide instance for current time window.
@@ -420,42 +515,32 @@ class ContinuouslyCastingDashboards:
     # Function to stop casting on all devices
     async def stop_casting_on_all_devices(self):
         _LOGGER.info("Stopping casting on all devices.")
-        for device_name in self.device_map.keys():
-            try:
-                process = await asyncio.create_subprocess_exec(
-                    "catt", "-d", device_name, "stop"
-                )
-                await process.wait()
-                _LOGGER.info(f"Stopped casting on {device_name}.")
-            except subprocess.CalledProcessError as e:
-                _LOGGER.error(f"Error stopping casting on {device_name}: {e}")
-            except ValueError as e:
-                _LOGGER.error(f"Invalid file descriptor for {device_name}: {e}")
-            except asyncio.TimeoutError as e:
-                _LOGGER.error(f"Timeout stopping casting on {device_name}: {e}")
+        # Devices are independent, so stop them concurrently rather than one after another
+        await asyncio.gather(
+            *(self.stop_casting_on_device(device_name) for device_name in self.device_map)
+        )
 
     # Function to stop casting on a specific device
     async def stop_casting_on_device(self, device_name):
         try:
-            process = await asyncio.create_subprocess_exec(
-                "catt", "-d", device_name, "stop"
-            )
-            await process.wait()
-            _LOGGER.info(f"Stopped casting on {device_name}.")
+            await self.run_catt(device_name, "stop", timeout=10)
+            _LOGGER.info("Stopped casting on %s.", device_name)
         except subprocess.CalledProcessError as e:
-            _LOGGER.error(f"Error stopping casting on {device_name}: {e}")
+            _LOGGER.error("Error stopping casting on %s: %s", device_name, e)
         except ValueError as e:
-            _LOGGER.error(f"Invalid file descriptor for {device_name}: {e}")
+            _LOGGER.error("Invalid file descriptor for %s: %s", device_name, e)
         except asyncio.TimeoutError as e:
-            _LOGGER.error(f"Timeout stopping casting on {device_name}: {e}")
+            _LOGGER.error("Timeout stopping casting on %s: %s", device_name, e)
 
-    def updatecurrentdevicemap(self):
+    def updatecurrentdevicemap(self, now=None):
         d_map = {}
-        now = datetime.now().time()
+        if now is None:
+            now = datetime.now().time()
 
 
         for device_name, d_info in self.all_device_map.items():
             selected_idx = 0
+            in_range = False
             
             for i, device_entity in enumerate(d_info["instances"]):
                 start_time = device_entity.get("start_time")
@@ -470,9 +555,12 @@ class ContinuouslyCastingDashboards:
 
                 if is_time_in_range:
                     selected_idx = i
+                    in_range = True
 
             # update entity and set to true if instance changed
             d_map[device_name] = d_info['instances'][selected_idx]            
+            # remember the window check so the main loop does not repeat it
+            d_map[device_name]['in_range'] = in_range
             if d_info['current_instance'] != selected_idx:
                 d_map[device_name]['instance_change'] = True
             else:
@@ -484,22 +572,72 @@ class ContinuouslyCastingDashboards:
             
         self.device_map = d_map
         _LOGGER.debug(
-            f"All device map: {self.all_device_map}\n"
-            f"Current device map: {self.device_map}"
+            "All device map: %s\nCurrent device map: %s",
+            self.all_device_map,
+            self.device_map,
         )
 
-    # Main loop for the casting process
-    max_retries = 5
-    retry_delay = 30
-    retry_count = 0
+    # Function to check if a device is cooling down after repeated failures, using up one skipped pass if so
+    def is_device_in_cooldown(self, device_name):
+        remaining = self._skip_cycles.get(device_name, 0)
+        if remaining:
+            self._skip_cycles[device_name] = remaining - 1
+            return True
+        return False
+
+    # Function to record whether a device could be checked, backing off exponentially while it keeps failing
+    def record_device_result(self, device_name, succeeded):
+        if succeeded:
+            self._failure_counts.pop(device_name, None)
+            self._skip_cycles.pop(device_name, None)
+            return
+        failures = self._failure_counts.get(device_name, 0) + 1
+        self._failure_counts[device_name] = failures
+        # Counted in main loop passes, a wall clock deadline would already have passed by the time
+        # the loop is back from the other devices. Capped so a device that was switched off comes back soon
+        cooldown = min(DEVICE_COOLDOWN_MAX_CYCLES, 2 ** (failures - 1))
+        self._skip_cycles[device_name] = cooldown
+        _LOGGER.warning(
+            "%s failed %s time(s) in a row, skipping it for the next %s pass(es) of the casting loop",
+            device_name,
+            failures,
+            cooldown,
+        )
+
+    # Function to wait for the cast delay between checks
+    async def wait_cast_delay(self):
+        await asyncio.sleep(self.cast_delay)
+
+    # Function to stop the main casting loop and release the state trigger listener and timeouts
+    async def stop(self, event=None):
+        if self._state_change_unsub is not None:
+            self._state_change_unsub()
+            self._state_change_unsub = None
+
+        for cancel in self._stop_timeout_unsubs.values():
+            cancel()
+        self._stop_timeout_unsubs.clear()
 
+        task = self._main_task
+        self._main_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    # Main loop for the casting process
     async def start(self):
-        self.hass.bus.async_listen("state_changed", self.handle_state_change_event)
+        # Keep a handle on the running loop so stop() can cancel it
+        self._main_task = asyncio.current_task()
+        # Only subscribe to the entities used by state triggers, not every state_changed event
+        if self.monitored_entities:
+            self._state_change_unsub = async_track_state_change_event(
+                self.hass, list(self.monitored_entities), self.handle_state_change_event
+            )
         while True:
             # Check if casting is enabled
             is_enabled = await self.is_casting_enabled()
             if not is_enabled and self.was_casting_enabled:
-                _LOGGER.info(f"Casting is disabled by the switch {self.switch_entity_id}. Stopping all casts.")
+                _LOGGER.info("Casting is disabled by the switch %s. Stopping all casts.", self.switch_entity_id)
                 await self.stop_casting_on_all_devices()  # Stop casting on all devices
                 self.was_casting_enabled = False  # Update the flag to indicate casting is now disabled
 
@@ -507,15 +645,12 @@ class ContinuouslyCastingDashboards:
                 self.was_casting_enabled = True  # Update the flag to indicate casting is enabled
 
             if not is_enabled:
-                try:
-                    await asyncio.sleep(self.cast_delay)
-                    continue
-                except asyncio.CancelledError:
-                    _LOGGER.error("Casting delayed, task cancelled.")
-                    return
+                await self.wait_cast_delay()
+                continue
 
+            # Read the clock once per cycle and share it with the device map update
             now = datetime.now().time()
-            self.updatecurrentdevicemap()
+            self.updatecurrentdevicemap(now)
             for device_name, device_info in self.device_map.items():
                 # Initialize the device-specific flag if not already done
                 if device_name not in self.device_was_casting_enabled:
@@ -524,7 +659,7 @@ class ContinuouslyCastingDashboards:
                 # Check if casting is enabled before each device
                 if not await self.is_casting_enabled():
                     if self.device_was_casting_enabled[device_name]:
-                        _LOGGER.info(f"Casting is disabled by the switch {self.switch_entity_id} during operation. Stopping cast for {device_name}.")
+                        _LOGGER.info("Casting is disabled by the switch %s during operation. Stopping cast for %s.", self.switch_entity_id, device_name)
                         await self.stop_casting_on_device(device_name)  # Stop casting on this device
                         self.device_was_casting_enabled[device_name] = False  # Update the flag to indicate casting is now disabled for this device
                     continue
@@ -536,65 +671,80 @@ class ContinuouslyCastingDashboards:
                 end_time = device_info["end_time"]
                 force_stop_start = device_info["instance_change"]
 
-                # Check if the current time is within the allowed casting range for the device
-                is_time_in_range = False
-                if start_time <= end_time:
-                    is_time_in_range = start_time <= now <= end_time
-                else:
-                    is_time_in_range = start_time <= now or now <= end_time
+                # Whether the current time is within the allowed casting range, worked out by updatecurrentdevicemap
+                is_time_in_range = device_info["in_range"]
 
                 if is_time_in_range:
-                    _LOGGER.info(f"Current local time: {now}")
+                    _LOGGER.debug("Current local time: %s", now)
                     _LOGGER.info(
-                        f"Local time is inside the allowed casting time for {device_name}. Start time: {start_time} - End time: {end_time}"
+                        "Local time is inside the allowed casting time for %s. Start time: %s - End time: %s",
+                        device_name,
+                        start_time,
+                        end_time,
                     )
                     # Skip normal flow if casting is triggered by state change
                     if self.casting_triggered_by_state_change:
                         _LOGGER.debug(
                             "Skipping normal flow as casting is triggered by state change"
                         )
-                        try:
-                            await asyncio.sleep(self.cast_delay)
-                        except asyncio.CancelledError:
-                            _LOGGER.error("Casting delayed, task cancelled.")
+                        await self.wait_cast_delay()
                         continue
                 
+                    # Skip devices that keep failing until their cooldown expires
+                    if self.is_device_in_cooldown(device_name):
+                        _LOGGER.debug(
+                            "%s is cooling down after repeated failures, skipping", device_name
+                        )
+                        await self.wait_cast_delay()
+                        continue
+
                     # Skip casting if speaker group is active
-                    if self.device_map[device_name]["speaker_groups"] is not None:
+                    if device_info["speaker_groups"] is not None:
                         if await self.check_speaker_group_state(device_name):
                             _LOGGER.info(
-                                f"Speaker Group playback is active on {device_name}. Skipping..."
+                                "Speaker Group playback is active on %s. Skipping...",
+                                device_name,
                             )
-                            try:
-                                await asyncio.sleep(self.cast_delay)
-                            except asyncio.CancelledError:
-                                _LOGGER.error("Casting delayed, task cancelled.")
+                            await self.wait_cast_delay()
                             continue
 
                     # Retry casting in case of errors
                     retry_count = 0
-                    while retry_count < self.max_retries:
+                    # Keep retries within one cast delay, a device that stays unreachable is left to the cooldown
+                    retry_deadline = self.hass.loop.time() + self.cast_delay
+                    while (
+                        retry_count < self.max_retries
+                        and self.hass.loop.time() < retry_deadline
+                    ):
                         try:
-                            if (await self.check_both_states(device_name)) is None:
+                            # One catt status per attempt, used for both the error and the active checks
+                            is_active = await self.check_both_states(device_name)
+                            if is_active is None:
                                 retry_count += 1
+                                if retry_count >= self.max_retries:
+                                    continue
+                                # Full jitter keeps devices that fail together from retrying in lockstep
+                                retry_sleep = random.uniform(0, self.retry_delay * 2 ** (retry_count - 1))
+                                retry_sleep = min(
+                                    retry_sleep, max(0, retry_deadline - self.hass.loop.time())
+                                )
                                 _LOGGER.warning(
-                                    f"Retrying in {self.retry_delay} seconds for {retry_count} time(s) due to previous errors"
+                                    "Retrying in %.0f seconds for %s time(s) due to previous errors",
+                                    retry_sleep,
+                                    retry_count,
                                 )
-                                try:
-                                    await asyncio.sleep(self.cast_delay)
-                                except asyncio.CancelledError:
-                                    _LOGGER.error("Casting delayed, task cancelled.")
+                                await asyncio.sleep(retry_sleep)
                                 continue
-                            elif (
-                                await self.check_both_states(device_name)
-                                & ~force_stop_start
-                            ):
+                            self.record_device_result(device_name, True)
+                            if is_active and not force_stop_start:
                                 _LOGGER.info(
-                                    f"HA Dashboard (or media) is playing on {device_name}..."
+                                    "HA Dashboard (or media) is playing on %s...",
+                                    device_name,
                                 )
                             else:
                                 _LOGGER.info(
-                                    f"HA Dashboard is NOT active on {device_name}..."
+                                    "HA Dashboard is NOT active on %s...",
+                                    device_name,
                                 )
 
                                 await self.cast_dashboard(
@@ -603,56 +753,68 @@ class ContinuouslyCastingDashboards:
                             break
                         except TypeError as e:
                             _LOGGER.error(
-                                f"Error encountered while checking both states for {device_name}: {e}"
+                                "Error encountered while checking both states for %s: %s",
+                                device_name,
+                                e,
                             )
                             break
                     else:
                         _LOGGER.error(
-                            f"Max retries exceeded for {device_name}. Skipping..."
+                            "Max retries exceeded for %s. Skipping...",
+                            device_name,
                         )
+                        self.record_device_result(device_name, False)
                         continue
-                    try:
-                        await asyncio.sleep(self.cast_delay)
-                    except asyncio.CancelledError:
-                        _LOGGER.error("Casting delayed, task cancelled.")
+                    await self.wait_cast_delay()
 
                 # If the current time is outside the allowed range, check for active HA cast sessions
                 else:
-                    _LOGGER.info(f"Current local time: {now}")
+                    _LOGGER.debug("Current local time: %s", now)
                     _LOGGER.info(
-                        f"Local time is outside the allowed casting time for {device_name}. Start time: {start_time} - End time: {end_time}"
+                        "Local time is outside the allowed casting time for %s. Start time: %s - End time: %s",
+                        device_name,
+                        start_time,
+                        end_time,
                     )
-                    _LOGGER.info(
-                        f"Checking for any active HA cast sessions on {device_name} to stop if necessary..."
+                    _LOGGER.debug(
+                        "Checking for any active HA cast sessions on %s to stop if necessary...",
+                        device_name,
                     )
 
                     if not is_time_in_range:
                         try:
                             if await self.check_dashboard_state(device_name):
                                 _LOGGER.info(
-                                    f"HA Dashboard is currently being cast on {device_name}. Stopping..."
+                                    "HA Dashboard is currently being cast on %s. Stopping...",
+                                    device_name,
                                 )
                                 try:
-                                    process = await asyncio.create_subprocess_exec(
-                                        "catt", "-d", device_name, "stop"
-                                    )
-                                    await process.wait()
+                                    await self.run_catt(device_name, "stop", timeout=10)
                                 except subprocess.CalledProcessError as e:
                                     _LOGGER.error(
-                                        f"Error stopping dashboard on {device_name}: {e}"
+                                        "Error stopping dashboard on %s: %s",
+                                        device_name,
+                                        e,
+                                    )
+                                    continue
+                                except asyncio.TimeoutError as e:
+                                    _LOGGER.error(
+                                        "Timeout stopping dashboard on %s: %s",
+                                        device_name,
+                                        e,
                                     )
                                     continue
                             else:
                                 _LOGGER.info(
-                                    f"HA Dashboard is NOT currently being cast on {device_name}. Skipping..."
+                                    "HA Dashboard is NOT currently being cast on %s. Skipping...",
+                                    device_name,
                                 )
                         except TypeError as e:
                             _LOGGER.error(
-                                f"Error encountered while checking dashboard state for {device_name}: {e}"
+                                "Error encountered while checking dashboard state for %s: %s",
+                                device_name,
+                                e,
                             )
                             continue
 
-                    try:
-                        await asyncio.sleep(self.cast_delay)
-                    except asyncio.CancelledError:
-                        _LOGGER.error("Casting delayed, task cancelled.")
+                    await self.wait_cast_delay()